@@ -1,24 +1,32 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
-from datetime import datetime
+from plotly.subplots import make_subplots
+from datetime import date, datetime
+from functools import lru_cache
 import os
+import re
+import copy
+import hashlib
+import html
+import tempfile
 from io import BytesIO
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Image, Table, TableStyle
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from urllib.request import urlopen
+import openpyxl
+from pandas.io.parsers import TextParser
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:  # openpyxl's read-only streaming is the fallback reader
+    CalamineWorkbook = None
 
 # ===================== PAGE CONFIGURATION =====================
 st.set_page_config(page_title="eThekwini WS-7761 Smart Meter Project", layout="wide")
 
-# Small mobile viewport hint
-st.markdown('<meta name="viewport" content="width=device-width, initial-scale=1.0">', unsafe_allow_html=True)
-
 # ===================== CUSTOM STYLE (RESPONSIVE UPDATES) =====================
-st.markdown(
-    """
+# stylesheet plus the small mobile viewport hint
+CUSTOM_CSS = """
     <style>
     body {
         background-color: #f7f9fb;
@@ -68,6 +76,10 @@ st.markdown(
         width: 100% !important; /* ensure full width inside columns */
         box-sizing: border-box;
     }
+    .dial-row {
+        display: grid;
+        gap: 1rem;
+    }
     .dial-label {
         text-align: center;
         font-weight: 500;
@@ -109,43 +121,224 @@ st.markdown(
         .stTabs [data-baseweb="tab"] { padding: 6px 8px; font-size: 14px; }
     }
     </style>
-    """,
-    unsafe_allow_html=True,
-)
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    """
+# comments and indentation are stripped once at import, so each rerun ships the compact form
+CUSTOM_CSS = re.sub(r"\s+", " ", re.sub(r"/\*.*?\*/", "", CUSTOM_CSS, flags=re.S)).strip()
+
+# Streamlit drops elements that a rerun does not redraw, so this is sent every run, as one element;
+# a session_state "already injected" guard would make the styles vanish on the second rerun
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 # ===================== FILE PATHS =====================
 data_path = "Ethekwini WS-7761.xlsx"
 install_path = "Weekly update sheet.xlsx"
+logo_path = "ethekwini_logo.png"
 logo_url = "https://github.com/genesisprepaidsolutions-a11y/Ethekwini/blob/main/ethekwini_logo.png?raw=true"
 
 # ===================== HELPER: FILE TIMESTAMPS =====================
 def file_last_modified(path):
-    return os.path.getmtime(path) if os.path.exists(path) else 0
+    # one stat per rerun; a missing file reads as 0 so the loaders return empty frames
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return 0
+
+# ===================== HELPER: LOGO BYTES =====================
+@st.cache_resource(show_spinner=False)
+def fetch_logo_bytes(path, url):
+    """
+    Return the logo PNG bytes, loaded once per process: the bundled file when present,
+    otherwise a download from the repository URL. Raises if neither is reachable; Streamlit
+    does not cache exceptions, so a failed download is retried on the next call.
+    """
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return f.read()
+    with urlopen(url, timeout=5) as resp:
+        return resp.read()
+
+def get_logo_bytes():
+    # None when the logo is unavailable right now; the failure itself is never cached
+    try:
+        return fetch_logo_bytes(logo_path, logo_url)
+    except Exception:
+        return None
+
+# ===================== PARQUET SHEET CACHE =====================
+CACHE_DIR = ".cache"
+# bump whenever the sheet readers or the cleaning in prepare_main/load_install_data change what
+# gets stored, so frames written by an older build are not reused (they are pruned on next load)
+CACHE_VERSION = 1
+
+def workbook_fingerprint(path, last_modified):
+    """
+    Cache key for one version of a workbook: its file name plus a sha1 over CACHE_VERSION, the
+    mtime and the first 64 KB of the file, so a copy with a new timestamp but equal bytes still differs.
+    """
+    with open(path, "rb") as f:
+        head = f.read(64 * 1024)
+    digest = hashlib.sha1(f"{CACHE_VERSION}:{last_modified!r}".encode() + head).hexdigest()[:16]
+    return f"{os.path.basename(path)}_{digest}"
+
+def cached_sheet_path(fingerprint, name):
+    return os.path.join(CACHE_DIR, f"{fingerprint}_{name}.parquet")
+
+def read_cached_sheet(fingerprint, name):
+    target = cached_sheet_path(fingerprint, name)
+    if not os.path.exists(target):
+        return None
+    try:
+        return pd.read_parquet(target)
+    except Exception:
+        return None
+
+def write_cached_sheet(fingerprint, name, df):
+    # sheets pyarrow cannot serialise (e.g. mixed-type columns) are simply read from Excel next time
+    # each writer gets its own temp file, so sessions filling the cache at once never publish
+    # each other's half-written parquet; os.replace makes the finished file appear atomically
+    target = cached_sheet_path(fingerprint, name)
+    tmp = None
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            df.to_parquet(f, compression="zstd", index=False)
+        os.replace(tmp, target)
+    except Exception:
+        if tmp is not None and os.path.exists(tmp):
+            os.remove(tmp)
+
+def prune_sheet_cache(path, fingerprint):
+    """
+    Remove cached sheets left behind by older versions of the workbook at `path`.
+    """
+    if not os.path.isdir(CACHE_DIR):
+        return
+    stale = re.compile(re.escape(os.path.basename(path)) + r"_[0-9a-f]{16}_")
+    with os.scandir(CACHE_DIR) as entries:
+        for entry in entries:
+            if stale.match(entry.name) and not entry.name.startswith(fingerprint + "_"):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+# ===================== EXCEL READERS (CALAMINE, OPENPYXL READ-ONLY FALLBACK) =====================
+def open_workbook(path):
+    if CalamineWorkbook is not None:
+        return CalamineWorkbook.from_path(path)
+    return openpyxl.load_workbook(path, read_only=True, data_only=True, keep_links=False)
+
+def is_calamine(wb):
+    return CalamineWorkbook is not None and isinstance(wb, CalamineWorkbook)
+
+def workbook_sheet_names(wb):
+    return list(wb.sheet_names) if is_calamine(wb) else wb.sheetnames
+
+def normalize_cell(v):
+    # calamine reports whole numbers as floats and dates as date; match openpyxl (and read_excel)
+    if v == "":
+        return None
+    if isinstance(v, float) and v.is_integer():
+        return int(v)
+    if type(v) is date:
+        return datetime(v.year, v.month, v.day)
+    return v
+
+def read_sheet_rows(wb, sheet_name):
+    """
+    Stream a worksheet into a list of row lists, trimming trailing empty cells and rows
+    the same way pandas.read_excel does.
+    """
+    if is_calamine(wb):
+        raw = wb.get_sheet_by_name(sheet_name).to_python(skip_empty_area=False)
+    else:
+        ws = wb[sheet_name]
+        ws.reset_dimensions()
+        raw = ws.iter_rows(values_only=True)
+    rows = []
+    for row in raw:
+        row = [normalize_cell(v) for v in row]
+        while row and row[-1] is None:
+            row.pop()
+        rows.append(row)
+    while rows and not rows[-1]:
+        rows.pop()
+    return rows
+
+def rows_to_frame(rows, header_row=0, dtype=None):
+    """
+    Build a frame from the trimmed rows through the same TextParser pass read_excel uses, so
+    duplicate headers become 'X.1', blank ones 'Unnamed: n', blank rows stay as NaN rows and
+    text cells such as 'true'/'false' or '12' are converted exactly as read_excel converts them.
+    """
+    if len(rows) <= header_row:
+        return pd.DataFrame()
+    width = max(len(r) for r in rows[header_row:])
+    # empty cells go in as "", as read_excel's readers hand them over, padded to the widest row
+    data = [["" if v is None else v for v in r] + [""] * (width - len(r)) for r in rows[header_row:]]
+    return TextParser(data, header=0, dtype=dtype, skip_blank_lines=False).read()
 
 # ===================== LOAD DATA (AUTO-REFRESH ENABLED) =====================
-@st.cache_data
-def load_data(path, last_modified):
-    if not os.path.exists(path):
-        return {}
-    xls = pd.ExcelFile(path)
-    sheets = {}
-    for s in xls.sheet_names:
-        try:
-            sheets[s] = pd.read_excel(xls, sheet_name=s)
-        except Exception:
-            sheets[s] = pd.DataFrame()
-    return sheets
+def load_sheet(path, fingerprint, sheet_name):
+    """
+    Read one sheet, from the parquet cache when possible; a miss opens its own
+    workbook handle and closes it once the rows are read.
+    """
+    cached = read_cached_sheet(fingerprint, sheet_name)
+    if cached is not None:
+        return cached
+    wb = open_workbook(path)
+    try:
+        df = rows_to_frame(read_sheet_rows(wb, sheet_name))
+    except Exception:
+        return pd.DataFrame()
+    finally:
+        wb.close()
+    write_cached_sheet(fingerprint, sheet_name, df)
+    return df
 
 @st.cache_data
-def load_install_data(path, last_modified, target_sheet_names=None):
+def load_data(path, last_modified, needed=None):
     """
-    Load an 'installations' style sheet. If target_sheet_names provided, prefer the first match.
+    Load the sheets of a workbook into a dict of DataFrames; only the names in `needed`, if given.
     """
     if not os.path.exists(path):
-        return pd.DataFrame()
-
-    xls = pd.ExcelFile(path)
-    sheet_names = xls.sheet_names
+        return {}
+    fingerprint = workbook_fingerprint(path, last_modified)
+    prune_sheet_cache(path, fingerprint)
+    wb = open_workbook(path)
+    try:
+        names = workbook_sheet_names(wb)
+    finally:
+        wb.close()
+    if needed is not None:
+        names = [s for s in names if s in needed]
+    return {s: load_sheet(path, fingerprint, s) for s in names}
+
+def find_header_row(rows, keywords=("contractor", "installer"), block=64):
+    """
+    Index of the first row with a cell mentioning any keyword (0 if none). Rows are scanned
+    as vectorised string matrices a block at a time, so tall sheets stop at the header.
+    """
+    for start in range(0, len(rows), block):
+        chunk = rows[start : start + block]
+        width = max((len(r) for r in chunk), default=0)
+        if width == 0:
+            continue
+        # only text cells can hold a keyword; numbers and dates are blanked instead of str()'d
+        cells = np.array([[v if isinstance(v, str) else "" for v in r] + [""] * (width - len(r)) for r in chunk], dtype=str)
+        low = np.char.lower(cells)
+        hit = np.zeros(low.shape, dtype=bool)
+        for k in keywords:
+            hit |= np.char.find(low, k) >= 0
+        rows_with_hit = hit.any(axis=1)
+        if rows_with_hit.any():
+            return start + int(rows_with_hit.argmax())
+    return 0
+
+def pick_install_sheet(sheet_names, target_sheet_names=None):
     chosen = None
     if target_sheet_names:
         # attempt to find a match case-insensitive
@@ -169,26 +362,37 @@ def load_install_data(path, last_modified, target_sheet_names=None):
 
     if not chosen:
         chosen = sheet_names[0] if len(sheet_names) > 0 else None
-    if not chosen:
-        return pd.DataFrame()
+    return chosen
 
-    raw = pd.read_excel(xls, sheet_name=chosen, header=None, dtype=object)
-    header_row_idx = None
-    for idx, row in raw.iterrows():
-        first_cell = str(row.iloc[0]).strip().lower() if pd.notna(row.iloc[0]) else ""
-        if "contractor" in first_cell or "installer" in first_cell or "contractors" in first_cell:
-            header_row_idx = idx
-            break
-        row_text = " ".join([str(x).lower() if pd.notna(x) else "" for x in row.tolist()])
-        if "contractor" in row_text or "installer" in row_text:
-            header_row_idx = idx
-            break
-
-    if header_row_idx is None:
-        header_row_idx = 0
+@st.cache_data
+def load_install_data(path, last_modified, target_sheet_names=None):
+    """
+    Load an 'installations' style sheet. If target_sheet_names provided, prefer the first match.
+    """
+    if not os.path.exists(path):
+        return pd.DataFrame()
 
+    fingerprint = workbook_fingerprint(path, last_modified)
+    prune_sheet_cache(path, fingerprint)
+    wb = open_workbook(path)
+    try:
+        chosen = pick_install_sheet(workbook_sheet_names(wb), target_sheet_names)
+        if not chosen:
+            return pd.DataFrame()
+        # the cleaned frame is cached, so a warm start skips both the sheet read and the header scan
+        cache_name = f"{chosen}.install"
+        cached = read_cached_sheet(fingerprint, cache_name)
+        if cached is not None:
+            return cached
+        rows = read_sheet_rows(wb, chosen)
+    finally:
+        wb.close()
+
+    header_row_idx = find_header_row(rows)
+
+    # the header is taken from the rows already read; the sheet is parsed only once
     try:
-        df = pd.read_excel(xls, sheet_name=chosen, header=header_row_idx, dtype=object)
+        df = rows_to_frame(rows, header_row=header_row_idx)
     except Exception:
         df = pd.DataFrame()
 
@@ -207,26 +411,99 @@ def load_install_data(path, last_modified, target_sheet_names=None):
         if colmap:
             df = df.rename(columns=colmap)
         if "Contractor" in df.columns:
-            df["Contractor"] = df["Contractor"].astype(str).str.strip()
+            df["Contractor"] = df["Contractor"].astype(str).str.strip().astype("category")
+        # dtypes are inferred on construction; only counts that arrived as text need coercing
         for numeric_col in ["Sites", "Installed"]:
-            if numeric_col in df.columns:
+            if numeric_col in df.columns and not pd.api.types.is_numeric_dtype(df[numeric_col]):
                 df[numeric_col] = pd.to_numeric(df[numeric_col], errors="coerce")
+        write_cached_sheet(fingerprint, cache_name, df)
 
     return df
 
+# ===================== CLEAN DATA (CACHED) =====================
+CATEGORY_COLUMNS = ("Progress", "Priority", "Bucket Name", "Contractor")
+
+# Arrow-backed strings with NaN for missing values (pandas' default "str" dtype)
+ARROW_STRING = pd.StringDtype("pyarrow", na_value=np.nan)
+
+def store_text_as_arrow(df):
+    """
+    Move pure-text object columns onto Arrow string buffers; mixed columns stay object.
+    """
+    for c in [c for c in df.columns if df[c].dtype == object]:
+        if pd.api.types.infer_dtype(df[c], skipna=True) == "string":
+            df[c] = df[c].astype(ARROW_STRING)
+    return df
+
+def coerce_dates(df):
+    """
+    Parse every column whose name mentions 'date' in one pass; unparseable cells become NaT.
+    """
+    date_cols = [c for c in df.columns if "date" in str(c).lower()]
+    if date_cols:
+        df[date_cols] = df[date_cols].apply(pd.to_datetime, dayfirst=True, errors="coerce")
+    return df
+
+# cleaning runs once per file version instead of on every Streamlit rerun
+@st.cache_data
+def prepare_main(path, last_modified):
+    """
+    Return the cleaned 'Tasks' sheet.
+    """
+    # the cleaned frame is cached too, so a warm start keeps parsed dates and categoricals as stored
+    fingerprint = workbook_fingerprint(path, last_modified) if os.path.exists(path) else None
+    if fingerprint:
+        cached = read_cached_sheet(fingerprint, "Tasks.clean")
+        if cached is not None:
+            return cached
+    sheets = load_data(path, last_modified, needed=("Tasks",))
+    df_main = sheets.get("Tasks", pd.DataFrame())
+    if not df_main.empty:
+        # missing cells stay NaN/NaT so dates keep datetime64; "Null" is only drawn at display time
+        df_main = coerce_dates(df_main)
+
+        df_main = store_text_as_arrow(df_main.drop(columns=[col for col in ["Is Recurring", "Late"] if col in df_main.columns]))
+        # low-cardinality text columns group and count on integer codes as categoricals
+        for c in CATEGORY_COLUMNS:
+            if c in df_main.columns:
+                df_main[c] = df_main[c].astype("category")
+        write_cached_sheet(fingerprint, "Tasks.clean", df_main)
+    return df_main
+
+@st.cache_data
+def average_task_duration(path, last_modified):
+    """
+    Mean days from start to due date over the tasks that have both, or None.
+    """
+    df_main = prepare_main(path, last_modified)
+    if df_main.empty or "Start date" not in df_main.columns or "Due date" not in df_main.columns:
+        return None
+    try:
+        return (df_main["Due date"] - df_main["Start date"]).dt.days.mean()
+    except Exception:
+        return None
+
+@st.cache_data
+def prepare_install(path, last_modified, target_sheet_names=None):
+    df_install = load_install_data(path, last_modified, target_sheet_names=target_sheet_names)
+    if not df_install.empty:
+        df_install = coerce_dates(df_install)
+        df_install = store_text_as_arrow(df_install.drop(columns=[col for col in ["Is Recurring", "Late"] if col in df_install.columns], errors="ignore"))
+    return df_install
+
 # Detect file changes by timestamp
 data_last_mod = file_last_modified(data_path)
 install_last_mod = file_last_modified(install_path)
 
 # Load (and auto-reload when files change)
-sheets = load_data(data_path, data_last_mod)
-df_main = sheets.get("Tasks", pd.DataFrame()).copy()
+df_main = prepare_main(data_path, data_last_mod)
+avg_duration = average_task_duration(data_path, data_last_mod)
 
 # main installations sheet (default)
-df_install = load_install_data(install_path, install_last_mod)
+df_install = prepare_install(install_path, install_last_mod)
 
-# read the 'Installations 2' sheet explicitly for the extra gauges (case-insensitive)
-df_install_phase2 = load_install_data(install_path, install_last_mod, target_sheet_names=["installations 2", "installations2", "installations 2 "])
+# the 'Installations 2' sheet feeds the extra gauges (matched case-insensitively)
+PHASE_TWO_SHEETS = ("installations 2", "installations2", "installations 2 ")
 
 # ===================== COMPUTE 'DATA AS OF' FROM INSTALLATIONS SHEET =====================
 def compute_data_as_of_from_installations(df_install, fallback_path=None):
@@ -252,7 +529,10 @@ def compute_data_as_of_from_installations(df_install, fallback_path=None):
             date_cols = [c for c in df_install.columns if 'date' in str(c).lower()]
             for c in date_cols:
                 try:
-                    series = pd.to_datetime(df_install[c], dayfirst=True, errors='coerce')
+                    # date columns were already parsed by coerce_dates when the sheet was cleaned
+                    series = df_install[c]
+                    if not pd.api.types.is_datetime64_any_dtype(series):
+                        series = pd.to_datetime(series, dayfirst=True, errors='coerce')
                     vals = series.dropna().values
                     if len(vals) > 0:
                         candidates.append(series.max())
@@ -315,7 +595,7 @@ with col2:
 
 with col3:
     try:
-        st.image("ethekwini_logo.png", width=150)
+        st.image(fetch_logo_bytes(logo_path, logo_url), width=150)
     except Exception:
         st.markdown("<div style='text-align:center;'><b>eThekwini</b></div>", unsafe_allow_html=True)
 
@@ -331,109 +611,352 @@ table_colors = {
     "Overdue": "#ffb3b3",
 }
 
-# ===================== CLEAN DATA =====================
-if not df_main.empty:
-    for c in [col for col in df_main.columns if "date" in col.lower()]:
-        df_main[c] = pd.to_datetime(df_main[c], dayfirst=True, errors="coerce")
+# ===================== TASK STATUS AGGREGATES (COMPUTED ONCE) =====================
+@st.cache_data
+def compute_kpis(path, last_modified, today):
+    """
+    Status masks and counts for the 'Tasks' sheet, shared by the KPI gauges, the task
+    table row colours and the PDF export. Keyed on the day as well, since 'overdue' moves with it.
+    """
+    df = prepare_main(path, last_modified)
+    if "Progress" in df.columns:
+        # Progress is categorical: lower-case its few categories, not every row
+        progress_lc = df["Progress"].astype("category").map(lambda v: str(v).lower())
+    else:
+        progress_lc = pd.Series([""] * len(df), index=df.index)
+    due_dt = df["Due date"] if "Due date" in df.columns else pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+    is_completed = progress_lc.eq("completed")
+    # plain array compare: the frames share one index, so there is nothing to align
+    overdue_mask = pd.Series((due_dt.to_numpy() < today.to_datetime64()) & ~is_completed.to_numpy(), index=df.index)
+    # one pass over Progress for every status count
+    status_counts = progress_lc.value_counts()
+    return {
+        "progress_lc": progress_lc,
+        "is_completed": is_completed,
+        "overdue_mask": overdue_mask,
+        "overdue": int(overdue_mask.sum()),
+        "completed": int(status_counts.get("completed", 0)),
+        "inprogress": int(status_counts.get("in progress", 0)),
+        "notstarted": int(status_counts.get("not started", 0)),
+    }
 
-    df_main = df_main.fillna("Null")
-    df_main = df_main.replace("NaT", "Null")
-    df_main = df_main.drop(columns=[col for col in ["Is Recurring", "Late"] if col in df_main.columns])
+today_ts = pd.Timestamp.today().normalize()
+kpis = compute_kpis(data_path, data_last_mod, today_ts)
+progress_lc = kpis["progress_lc"]
+is_completed = kpis["is_completed"]
+overdue_mask = kpis["overdue_mask"]
+overdue_count = kpis["overdue"]
+completed_count = kpis["completed"]
+inprogress_count = kpis["inprogress"]
+notstarted_count = kpis["notstarted"]
 
-avg_duration = None
-if not df_main.empty and "Start date" in df_main.columns and "Due date" in df_main.columns:
-    df_duration = df_main.copy().replace("Null", None)
-    try:
-        df_duration["Start date"] = pd.to_datetime(df_duration["Start date"], errors="coerce")
-        df_duration["Due date"] = pd.to_datetime(df_duration["Due date"], errors="coerce")
-        df_duration["Duration"] = (df_duration["Due date"] - df_duration["Start date"]).dt.days
-        avg_duration = df_duration["Duration"].mean()
-    except Exception:
-        avg_duration = None
+# status values that count a site as installed when the status column is text
+COMPLETED_VALUES = frozenset({"completed", "installed", "complete", "yes", "done"})
 
-if not df_install.empty:
-    for c in [col for col in df_install.columns if "date" in col.lower()]:
-        df_install[c] = pd.to_datetime(df_install[c], dayfirst=True, errors="coerce")
-    df_install = df_install.fillna("Null").replace("NaT", "Null")
-    df_install = df_install.drop(columns=[col for col in ["Is Recurring", "Late"] if col in df_install.columns], errors="ignore")
+def first_column_matching(columns, pattern):
+    """
+    First column whose lower-cased name matches the regex `pattern`, or None.
+    """
+    hits = columns[pd.Index(columns).astype(str).str.lower().str.contains(pattern, regex=True)]
+    return hits[0] if len(hits) else None
 
-if not df_install_phase2.empty:
-    for c in [col for col in df_install_phase2.columns if "date" in col.lower()]:
-        df_install_phase2[c] = pd.to_datetime(df_install_phase2[c], dayfirst=True, errors="coerce")
-    df_install_phase2 = df_install_phase2.fillna("Null").replace("NaT", "Null")
-    df_install_phase2 = df_install_phase2.drop(columns=[col for col in ["Is Recurring", "Late"] if col in df_install_phase2.columns], errors="ignore")
+def first_text_column(df):
+    return next((c for c in df.select_dtypes(include=["object", "string"]).columns if "date" not in str(c).lower()), None)
 
 # helper to create a summary (Completed_Sites, Total_Sites) from a given installations df
 def compute_install_summary(df):
     if df is None or df.empty:
         return pd.DataFrame()
     # detect columns
-    contractor_col = None
-    status_col = None
-    sites_col = None
-    for c in df.columns:
-        low = str(c).lower()
-        if not contractor_col and ("contractor" in low or "installer" in low or "contractors" in low):
-            contractor_col = c
-        if not status_col and ("status" in low or "install" in low or "installed" in low or "complete" in low or "progress" in low):
-            status_col = c
-        if not sites_col and ("site" in low or "sites" in low or "total" in low):
-            sites_col = c
+    contractor_col = first_column_matching(df.columns, "contractor|installer")
+    status_col = first_column_matching(df.columns, "status|install|complete|progress")
+    sites_col = first_column_matching(df.columns, "site|total")
 
     # fallback heuristics
     if not contractor_col:
-        for c in df.columns:
-            if df[c].dtype == object and not any(k in str(c).lower() for k in ["date"]):
-                contractor_col = c
-                break
+        contractor_col = first_text_column(df)
 
     if not status_col:
-        for c in df.columns:
-            low = str(c).lower()
-            if "progress" in low or "state" in low:
-                status_col = c
-                break
+        status_col = first_column_matching(df.columns, "progress|state")
 
     # compute summary
     try:
-        if pd.api.types.is_numeric_dtype(df[status_col]) if status_col in df.columns else False or (status_col in df.columns and df[status_col].dropna().apply(lambda x: str(x).replace('.','',1).isdigit()).all()):
-            if sites_col:
-                summary = df.groupby(contractor_col).agg(
-                    Installed_Sites=(status_col, "sum"),
-                    Total_Sites=(sites_col, "sum"),
-                ).reset_index()
-            else:
-                summary = df.groupby(contractor_col).agg(
-                    Installed_Sites=(status_col, "sum"),
-                ).reset_index()
-                summary["Total_Sites"] = summary["Installed_Sites"]
-            summary = summary.rename(columns={"Installed_Sites": "Completed_Sites", "Total_Sites": "Total_Sites"})
+        status_present = status_col in df.columns
+        is_numeric = status_present and (
+            pd.api.types.is_numeric_dtype(df[status_col])
+            or bool(pd.to_numeric(df[status_col].dropna(), errors="coerce").notna().all())
+        )
+        if is_numeric:
+            # both summed columns are coerced to numbers once, so the groupby sums run on float64
+            installed_n = pd.to_numeric(df[status_col], errors="coerce").fillna(0)
+            sites_n = pd.to_numeric(df[sites_col], errors="coerce").fillna(0) if sites_col else installed_n
+            summary = (
+                df.assign(_installed_n=installed_n, _sites_n=sites_n)
+                .groupby(contractor_col, observed=True)
+                .agg(Completed_Sites=("_installed_n", "sum"), Total_Sites=("_sites_n", "sum"))
+                .reset_index()
+            )
         else:
             summary = (
-                df.assign(_is_completed=df[status_col].apply(lambda v: str(v).strip().lower() in ("completed","installed","complete","yes","done")) if status_col in df.columns else False)
-                .groupby(contractor_col)
-                .agg(Total_Sites=(status_col if status_col in df.columns else df.columns[0], "count"), Completed_Sites=("_is_completed", "sum"))
+                df.assign(_is_completed=df[status_col].astype("string").str.strip().str.lower().isin(COMPLETED_VALUES) if status_present else False)
+                .groupby(contractor_col, observed=True)
+                .agg(Total_Sites=(status_col if status_present else df.columns[0], "count"), Completed_Sites=("_is_completed", "sum"))
                 .reset_index()
             )
     except Exception:
         # fallback minimal summary
         if "Contractor" in df.columns:
-            temp = df.copy()
-            temp["__completed"] = temp.iloc[:, 0].apply(lambda x: False)
-            summary = temp.groupby("Contractor").agg(Total_Sites=(temp.columns[0], "count"), Completed_Sites=("__completed", "sum")).reset_index()
+            temp = df.assign(__completed=False)
+            summary = temp.groupby("Contractor", observed=True).agg(Total_Sites=(temp.columns[0], "count"), Completed_Sites=("__completed", "sum")).reset_index()
         else:
             summary = pd.DataFrame()
     return summary
 
+# summaries are cached per workbook version, so reruns skip the column sniffing and groupby
+@st.cache_data
+def install_summary(path, last_modified, target_sheet_names=None):
+    return compute_install_summary(prepare_install(path, last_modified, target_sheet_names=target_sheet_names))
+
 # compute summaries for main and phase2
-summary_main = compute_install_summary(df_install)
-summary_phase2 = compute_install_summary(df_install_phase2)
+summary_main = install_summary(install_path, install_last_mod)
+summary_phase2 = install_summary(install_path, install_last_mod, target_sheet_names=PHASE_TWO_SHEETS)
+
+# ===================== GAUGES (CACHED FIGURES) =====================
+def gauge_indicator(pct, title, dial_color):
+    return go.Indicator(
+        mode="gauge+number",
+        value=pct,
+        number={"suffix": "%", "font": {"size": 30, "color": dial_color}},
+        title={"text": title, "font": {"size": 20, "color": dial_color}},
+        gauge={
+            "axis": {"range": [0, 100], "tickwidth": 1, "tickcolor": "gray"},
+            "bar": {"color": dial_color, "thickness": 0.35},
+            "bgcolor": "#f7f9fb",
+            "steps": [{"range": [0, 100], "color": "#e0e0e0"}],
+        },
+    )
+
+# the dial cache is bounded: every new day or data version adds fresh (value, title) keys
+GAUGE_CACHE_ENTRIES = 256
+
+# one validated dial, reused as a plain dict: per gauge only the value, title and colours change
+GAUGE_TEMPLATE = {"type": "indicator", **gauge_indicator(0, "", "#000000").to_plotly_json()}
+
+@lru_cache(maxsize=16)
+def gauge_row_layout(cols, margin, height):
+    """
+    The layout and per-cell domains of a 1 x cols indicator grid, built once per shape.
+    """
+    l, r, t, b = margin
+    fig = make_subplots(rows=1, cols=cols, specs=[[{"type": "indicator"}] * cols])
+    fig.update_layout(autosize=True, height=height, margin=dict(l=l, r=r, t=t, b=b))
+    domains = [fig.get_subplot(1, j + 1) for j in range(cols)]
+    return fig.to_dict()["layout"], tuple({"x": list(d.x), "y": list(d.y)} for d in domains)
+
+@st.cache_data(show_spinner=False, max_entries=GAUGE_CACHE_ENTRIES)
+def gauge_row_figure(gauges, cols=5, margin=(15, 15, 40, 20), height=320):
+    """
+    Put a row of (pct, title, colour) gauges into a single indicator-subplot figure so a
+    row costs one st.plotly_chart call; unused cells keep each dial the size of a KPI gauge.
+    """
+    layout, domains = gauge_row_layout(cols, margin, height)
+    data = []
+    for (pct, title, dial_color), domain in zip(gauges, domains):
+        trace = copy.deepcopy(GAUGE_TEMPLATE)
+        trace["value"] = pct
+        trace["title"]["text"] = title
+        trace["title"]["font"]["color"] = dial_color
+        trace["number"]["font"]["color"] = dial_color
+        trace["gauge"]["bar"]["color"] = dial_color
+        trace["domain"] = domain
+        data.append(trace)
+    return {"data": data, "layout": layout}
+
+def render_contractor_row(gauges, labels, key, cols=3):
+    """
+    Draw up to `cols` contractor dials as one chart, with their install counts underneath
+    in a single markdown grid lined up with the dials.
+    """
+    st.plotly_chart(gauge_row_figure(tuple(gauges), cols=cols, margin=(8, 8, 30, 8), height=300), use_container_width=True, key=key)
+    cards = "".join(f"<div class='metric-card'><div class='dial-label'>{label}</div></div>" for label in labels)
+    st.markdown(f"<div class='dial-row' style='grid-template-columns: repeat({cols}, 1fr);'>{cards}</div>", unsafe_allow_html=True)
+
+# ===================== TIMELINE (WEBGL FOR LARGE TASK LISTS) =====================
+TIMELINE_WEBGL_THRESHOLD = 200
+
+def timeline_webgl_figure(timeline, color_map):
+    """
+    Draw each task as a thick Scattergl line from start to due date. One WebGL trace per
+    progress label replaces one SVG bar per task, which keeps big timelines responsive.
+    """
+    fig = go.Figure()
+    for label, grp in timeline.groupby("color_label", sort=False, observed=True):
+        n = len(grp)
+        xs = np.empty(n * 3, dtype=object)
+        ys = np.empty(n * 3, dtype=object)
+        # box as Timestamps: a raw datetime64[ns] array would land in the object array as int nanoseconds
+        xs[0::3] = grp["Start date"].astype(object).to_numpy()
+        xs[1::3] = grp["Due date"].astype(object).to_numpy()
+        ys[0::3] = ys[1::3] = grp["task_short"].to_numpy()
+        # None breaks the line between tasks
+        fig.add_trace(
+            go.Scattergl(
+                x=xs, y=ys, mode="lines", name=label,
+                line={"width": 8, "color": color_map.get(label)},
+            )
+        )
+    fig.update_layout(title="Task Timeline", legend_title_text="color_label")
+    return fig
+
+# past this many bars the timeline keeps only the longest tasks, with at least one per start week
+TIMELINE_MAX_TASKS = 2000
+
+def thin_timeline(timeline, max_tasks=TIMELINE_MAX_TASKS):
+    """
+    Cap the number of bars at `max_tasks`: the longest task of every start week is kept (when
+    there are no more weeks than slots) and the remaining slots go to the longest tasks overall.
+    """
+    if len(timeline) <= max_tasks:
+        return timeline
+    weeks = timeline["Start date"].dt.to_period("W")
+    days = (timeline["Due date"] - timeline["Start date"]).dt.total_seconds()
+    keep = np.zeros(len(timeline), dtype=bool)
+    if weeks.nunique() <= max_tasks:
+        keep |= (days.groupby(weeks).rank(method="first", ascending=False) == 1).to_numpy()
+    longest_first = np.argsort(-days.to_numpy(), kind="stable")
+    keep[longest_first[~keep[longest_first]][: max_tasks - int(keep.sum())]] = True
+    return timeline[keep]
+
+# ===================== PDF REPORT (CACHED) =====================
+# reportlab is imported inside these functions so its import cost is only paid when a report is built
+def paragraph_rows(df, cell_style, null_style):
+    from reportlab.platypus import Paragraph
+
+    # cells come from one flat object array; every missing cell in a table shares one flowable,
+    # and so does every repeat of a value (statuses, buckets, dates)
+    null_para = Paragraph("<i>Null</i>", null_style)
+    paras = {}
+
+    def para(text):
+        p = paras.get(text)
+        if p is None:
+            p = paras[text] = Paragraph(text, cell_style)
+        return p
+
+    flat = df.to_numpy(dtype=object).ravel()
+    missing = df.isna().to_numpy().ravel()
+    cells = [null_para if m else para(str(v)) for v, m in zip(flat, missing)]
+    width = len(df.columns)
+    return [cells[i : i + width] for i in range(0, len(cells), width)]
+
+# LongTable layout still grows faster than linearly with rows, so long tables are cut into groups
+PDF_ROWS_PER_TABLE = 25
+
+def table_groups(header, rows, col_widths, style):
+    """
+    Lay `rows` out as consecutive tables of at most PDF_ROWS_PER_TABLE rows, each repeating `header`.
+    """
+    from reportlab.platypus import LongTable, Spacer
+
+    flowables = []
+    for i in range(0, max(len(rows), 1), PDF_ROWS_PER_TABLE):
+        if flowables:
+            flowables.append(Spacer(1, 6))
+        table = LongTable([header] + rows[i : i + PDF_ROWS_PER_TABLE], colWidths=col_widths, repeatRows=1)
+        table.setStyle(style)
+        flowables.append(table)
+    return flowables
+
+@st.cache_data(show_spinner=False)
+def build_pdf(data_last_modified, install_last_modified, kpi_rows, logo_bytes):
+    """
+    Render the project report to PDF bytes. Keyed on the workbook timestamps, the KPI values and
+    the logo, so reruns reuse the same document until the data (or today's overdue count) changes
+    and a report built while the logo was unreachable is not served once it is back.
+    """
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Image, Table, TableStyle
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+    df_main = prepare_main(data_path, data_last_modified)
+    df_install = prepare_install(install_path, install_last_modified)
+
+    buf = BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=landscape(A4))
+    story = []
+    styles = getSampleStyleSheet()
+
+    cell_style = ParagraphStyle(name="CellStyle", fontSize=8, leading=10, alignment=1)
+    null_style = ParagraphStyle(name="NullStyle", fontSize=8, textColor=colors.grey,
+                                leading=10, alignment=1, fontName="Helvetica-Oblique")
+
+    story.append(Paragraph("<b>Ethekwini WS-7761 Smart Meter Project Report</b>", styles["Title"]))
+    story.append(Spacer(1, 12))
+    story.append(Paragraph(f"Generated on: {datetime.now().strftime('%d %B %Y, %H:%M')}", styles["Normal"]))
+    story.append(Spacer(1, 12))
+    if logo_bytes:
+        story.append(Image(BytesIO(logo_bytes), width=120, height=70))
+        story.append(Spacer(1, 12))
+
+    kpi_data = [["Metric", "Count"]] + [list(r) for r in kpi_rows]
+    table = Table(kpi_data, colWidths=[200, 100])
+    table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("GRID", (0, 0), (-1, -1), 1, colors.grey),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ]))
+    story.append(table)
+    story.append(Spacer(1, 20))
+
+    data_table_style = TableStyle([
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        # tight fixed padding leaves more of each fixed-width column to the text, so cells wrap less
+        ("LEFTPADDING", (0, 0), (-1, -1), 2),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 2),
+        ("TOPPADDING", (0, 0), (-1, -1), 1),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 1),
+    ])
+
+    if not df_install.empty:
+        story.append(Paragraph("<b>Installations Summary</b>", styles["Heading2"]))
+        story.append(Spacer(1, 6))
+        install_head = df_install.head(10)
+        col_count_i = len(install_head.columns) if len(install_head.columns) > 0 else 1
+        story.extend(table_groups(
+            list(install_head.columns),
+            paragraph_rows(install_head, cell_style, null_style),
+            [(A4[1] - 80) / col_count_i] * col_count_i,
+            data_table_style,
+        ))
+        story.append(Spacer(1, 12))
+
+    story.append(Paragraph("<b>Task Summary</b>", styles["Heading2"]))
+    limited = df_main.head(15)
+
+    col_count = len(limited.columns) if len(limited.columns) > 0 else 1
+    story.extend(table_groups(
+        list(limited.columns),
+        paragraph_rows(limited, cell_style, null_style),
+        [(A4[1] - 80) / col_count] * col_count,
+        data_table_style,
+    ))
+    story.append(Spacer(1, 20))
+    story.append(Paragraph("Ethekwini Municipality | Automated Project Report", styles["Normal"]))
+
+    doc.build(story)
+    return buf.getvalue()
 
 # ===================== MAIN TABS =====================
-tabs = st.tabs(["Installations", "KPIs", "Task Breakdown", "Timeline", "Export Report"])
+# only the selected tab is rendered; switching tabs triggers a rerun that draws the new one
+tabs = st.tabs(["Installations", "KPIs", "Task Breakdown", "Timeline", "Export Report"], key="main_tab", on_change="rerun")
 
 # ===================== INSTALLATIONS TAB =====================
-with tabs[0]:
+def render_installations_tab():
     st.subheader("📦 Installations Status")
 
     if not df_install.empty:
@@ -442,58 +965,18 @@ with tabs[0]:
         st.markdown(f"Total Contractors: **{unique_contractors}**")
 
         # determine column names used by main df (for rendering labels)
-        contractor_col_main = None
-        status_col_main = None
-        sites_col_main = None
-        if "Contractor" in df_install.columns:
-            contractor_col_main = "Contractor"
-        if "Installed" in df_install.columns:
-            status_col_main = "Installed"
-        if "Sites" in df_install.columns:
-            sites_col_main = "Sites"
-        for c in df_install.columns:
-            low = str(c).lower()
-            if not contractor_col_main and ("contractor" in low or "installer" in low or "contractors" in low):
-                contractor_col_main = c
-            if not status_col_main and ("status" in low or "install" in low or "installed" in low or "complete" in low):
-                status_col_main = c
-            if not sites_col_main and ("site" in low or "sites" in low or "total" in low):
-                sites_col_main = c
-
-        if not status_col_main:
-            for c in df_install.columns:
-                low = str(c).lower()
-                if "progress" in low or "state" in low:
-                    status_col_main = c
-                    break
-
+        cols = df_install.columns
+        contractor_col_main = "Contractor" if "Contractor" in cols else first_column_matching(cols, "contractor|installer")
+        status_col_main = "Installed" if "Installed" in cols else (
+            first_column_matching(cols, "status|install|complete") or first_column_matching(cols, "progress|state")
+        )
+        sites_col_main = "Sites" if "Sites" in cols else first_column_matching(cols, "site|total")
         if not contractor_col_main:
-            for c in df_install.columns:
-                if df_install[c].dtype == object and not any(k in str(c).lower() for k in ["date"]):
-                    contractor_col_main = c
-                    break
+            contractor_col_main = first_text_column(df_install)
 
         if contractor_col_main and status_col_main:
             st.markdown("### ⚙️ Contractor Installation Progress")
 
-            def make_contractor_gauge(completed, total, title, dial_color="#007acc"):
-                pct = (completed / total * 100) if total and total > 0 else 0
-                fig = go.Figure(
-                    go.Indicator(
-                        mode="gauge+number",
-                        value=pct,
-                        number={"suffix": "%", "font": {"size": 30, "color": dial_color}},
-                        title={"text": title, "font": {"size": 20, "color": dial_color}},
-                        gauge={
-                            "axis": {"range": [0, 100], "tickwidth": 1, "tickcolor": "gray"},
-                            "bar": {"color": dial_color, "thickness": 0.35},
-                            "bgcolor": "#f7f9fb",
-                            "steps": [{"range": [0, 100], "color": "#e0e0e0"}],
-                        },
-                    )
-                )
-                fig.update_layout(autosize=True, margin=dict(l=8, r=8, t=30, b=8))
-                return fig
             # --- BEGIN: Extra 3 gauges reading from 'Installations 2' sheet (PHASE Two) ---
             # Prefer summary_phase2 (Installations 2); fallback to summary_main
             use_summary = summary_phase2 if (not summary_phase2.empty) else summary_main
@@ -505,7 +988,11 @@ with tabs[0]:
                 # use first column as contractor column
                 contractor_column = use_summary.columns[0]
                 # pick first three rows (repeat last if fewer)
-                names = list(use_summary[contractor_column].astype(str).tolist())
+                names = use_summary[contractor_column].astype(str).tolist()
+                # one lookup keyed by contractor name (first row wins, as before)
+                lookup = {}
+                for nm, rec in zip(names, use_summary.to_dict("records")):
+                    lookup.setdefault(nm, rec)
                 extra_names = []
                 if len(names) == 0:
                     extra_names = ["No Contractor", "No Contractor", "No Contractor"]
@@ -518,9 +1005,9 @@ with tabs[0]:
 
                 extra_records = []
                 for nm in extra_names:
-                    match = use_summary[use_summary[contractor_column].astype(str) == str(nm)]
-                    if not match.empty:
-                        rec = match.iloc[0].to_dict()
+                    rec = lookup.get(nm)
+                    if rec is not None:
+                        rec = dict(rec)
                         # normalize keys to have Completed_Sites and Total_Sites
                         if "Completed_Sites" not in rec and "Completed" in rec:
                             rec["Completed_Sites"] = rec.get("Completed")
@@ -532,8 +1019,9 @@ with tabs[0]:
                         extra_records.append({contractor_column: nm, "Completed_Sites": 0, "Total_Sites": 0})
 
             st.markdown("### PHASE Two")
-            cols_extra = st.columns(len(extra_records))
-            for j, rec in enumerate(extra_records):
+            extra_gauges = []
+            extra_labels = []
+            for rec in extra_records:
                 # contractor label detection
                 contractor_label = list(rec.keys())[0] if len(rec.keys())>0 else "Contractor"
                 # get values robustly
@@ -546,12 +1034,9 @@ with tabs[0]:
                     color = "#007acc"
                 else:
                     color = "#e67300"
-                with cols_extra[j]:
-                    st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
-                    chart_key = f"phase1_extra_gauge_{j}_{str(rec.get(contractor_label,'')).replace(' ','_')}"
-                    st.plotly_chart(make_contractor_gauge(completed, total, str(rec.get(contractor_label, "Contractor")), dial_color=color), use_container_width=True, key=chart_key)
-                    st.markdown(f"<div class='dial-label'>{completed} / {total} installs</div>", unsafe_allow_html=True)
-                    st.markdown("</div>", unsafe_allow_html=True)
+                extra_gauges.append((pct, str(rec.get(contractor_label, "Contractor")), color))
+                extra_labels.append(f"{completed} / {total} installs")
+            render_contractor_row(extra_gauges, extra_labels, key="phase2_gauge_row")
             st.markdown("---")
             # label requested: put PHASE One below PHASE Two gauges
             st.markdown("### PHASE One")
@@ -561,8 +1046,9 @@ with tabs[0]:
             records = summary_main.to_dict("records")
             for i in range(0, len(records), 3):
                 row_items = records[i : i + 3]
-                cols = st.columns(len(row_items))
-                for j, rec in enumerate(row_items):
+                row_gauges = []
+                row_labels = []
+                for rec in row_items:
                     completed = int(rec.get("Completed_Sites", 0) if rec.get("Completed_Sites", 0) is not None else 0)
                     total = int(rec.get("Total_Sites", 0) if rec.get("Total_Sites", 0) is not None else 0)
                     pct = (completed / total * 100) if total > 0 else 0
@@ -572,25 +1058,21 @@ with tabs[0]:
                         color = "#007acc"
                     else:
                         color = "#e67300"
-                    with cols[j]:
-                        st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
-                        contractor_safe = str(rec.get(contractor_col_main, "")).replace(" ", "_")
-                        chart_key = f"gauge_{i}_{j}_{contractor_safe}"
-                        st.plotly_chart(make_contractor_gauge(completed, total, str(rec.get(contractor_col_main, rec.get(list(rec.keys())[0], 'Contractor'))), dial_color=color), use_container_width=True, key=chart_key)
-                        st.markdown(f"<div class='dial-label'>{completed} / {total} installs</div>", unsafe_allow_html=True)
-                        st.markdown("</div>", unsafe_allow_html=True)
+                    row_gauges.append((pct, str(rec.get(contractor_col_main, rec.get(list(rec.keys())[0], 'Contractor'))), color))
+                    row_labels.append(f"{completed} / {total} installs")
+                render_contractor_row(row_gauges, row_labels, key=f"gauge_row_{i}")
 
             # --- NEW: Simplified Combined Table showing only Combined Completed & Combined Total per contractor (sorted) ---
             try:
                 # prepare phase one and phase two dataframes
-                phase1_df = summary_main.copy() if not summary_main.empty else pd.DataFrame()
-                phase2_df = summary_phase2.copy() if not summary_phase2.empty else pd.DataFrame()
+                phase1_df = summary_main
+                phase2_df = summary_phase2
 
                 # standardize column names
                 def standardize(df):
                     if df.empty:
                         return df
-                    df = df.copy()
+                    # no defensive copy: rename/assign return new frames that share data until written (copy-on-write)
                     if 'Contractor' not in df.columns:
                         df = df.rename(columns={df.columns[0]: 'Contractor'})
                     if 'Completed_Sites' not in df.columns and 'Completed' in df.columns:
@@ -600,9 +1082,9 @@ with tabs[0]:
                     # ensure numeric
                     for col in ['Completed_Sites', 'Total_Sites']:
                         if col in df.columns:
-                            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
+                            df = df.assign(**{col: pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)})
                         else:
-                            df[col] = 0
+                            df = df.assign(**{col: 0})
                     return df[['Contractor', 'Completed_Sites', 'Total_Sites']]
 
                 p1 = standardize(phase1_df)
@@ -621,7 +1103,7 @@ with tabs[0]:
                     merged['Combined Total'] = merged['Total_Sites_Phase1'] + merged['Total_Sites_Phase2']
 
                     # select only required columns and sort by Combined Total descending
-                    display_df = merged[['Contractor', 'Combined Completed', 'Combined Total']].copy()
+                    display_df = merged[['Contractor', 'Combined Completed', 'Combined Total']]
                     display_df = display_df.sort_values(by='Combined Total', ascending=False).reset_index(drop=True)
 
                     # drop any rows where Contractor is null/blank
@@ -642,171 +1124,172 @@ with tabs[0]:
         st.info("No installations data found in the selected workbook.")
 
 # ===================== KPI TAB =====================
-with tabs[1]:
+PRIORITY_COLORS = ("#ff6600", "#0099cc", "#00cc66", "#cc3366")
+
+@st.cache_data(show_spinner=False)
+def breakdown_gauges(path, last_modified, today):
+    """
+    (priority gauges, bucket completion gauges) for the insights expander, derived once per
+    workbook version instead of on every widget interaction.
+    """
+    df = prepare_main(path, last_modified)
+    priority_counts = df.get("Priority", pd.Series([])).value_counts(normalize=True) * 100
+    priority_gauges = tuple(
+        (float(pct), f"{priority} Priority", PRIORITY_COLORS[i % len(PRIORITY_COLORS)])
+        for i, (priority, pct) in enumerate(priority_counts.items())
+    )
+    if "Bucket Name" not in df.columns:
+        return priority_gauges, ()
+
+    # share of completed tasks per bucket, from the cached completion mask
+    is_completed = compute_kpis(path, last_modified, today)["is_completed"]
+    buckets = (
+        (is_completed.groupby(df["Bucket Name"], observed=True).mean() * 100)
+        .rename("Completion %")
+        .reset_index()
+    )
+    # Reorder so 'Setup and Mobilisation' sits immediately after 'Post Implementation Phase' if present
+    buckets['Bucket Name'] = buckets['Bucket Name'].astype(str).str.strip()
+
+    pip_idx = None
+    setup_idx = None
+    for idx_row, name in enumerate(buckets['Bucket Name'].astype(str)):
+        low = name.lower()
+        if 'post implementation' in low:
+            pip_idx = idx_row
+        if 'setup' in low and 'mobil' in low:
+            setup_idx = idx_row
+
+    if setup_idx is not None:
+        setup_row = buckets.iloc[[setup_idx]]
+        buckets = buckets.drop(buckets.index[setup_idx]).reset_index(drop=True)
+        if pip_idx is not None:
+            if setup_idx < pip_idx:
+                pip_idx -= 1
+            insert_at = pip_idx + 1
+        else:
+            insert_at = min(4, len(buckets))
+        buckets = pd.concat([buckets.iloc[:insert_at], setup_row, buckets.iloc[insert_at:]]).reset_index(drop=True)
+
+    bucket_gauges = tuple((float(row[1]), str(row[0]), "#006666") for row in buckets.itertuples(index=False, name=None))
+    return priority_gauges, bucket_gauges
+
+def render_kpi_tab():
     if not df_main.empty:
         st.subheader("Key Performance Indicators")
 
         total = len(df_main)
-        progress_series = df_main.get("Progress", pd.Series([""] * len(df_main)))
-        completed = progress_series.str.lower().eq("completed").sum()
-        inprogress = progress_series.str.lower().eq("in progress").sum()
-        notstarted = progress_series.str.lower().eq("not started").sum()
-        overdue = (
-            (pd.to_datetime(df_main.get("Due date", pd.Series([])), errors="coerce") < pd.Timestamp.today())
-            & (~progress_series.str.lower().eq("completed"))
-        ).sum()
-
-        def create_colored_gauge(value, total, title, dial_color):
-            pct = (value / total * 100) if total > 0 else 0
-            fig = go.Figure(
-                go.Indicator(
-                    mode="gauge+number",
-                    value=pct,
-                    number={"suffix": "%", "font": {"size": 30, "color": dial_color}},
-                    title={"text": title, "font": {"size": 20, "color": dial_color}},
-                    gauge={
-                        "axis": {"range": [0, 100], "tickwidth": 1, "tickcolor": "gray"},
-                        "bar": {"color": dial_color, "thickness": 0.35},
-                        "bgcolor": "#f7f9fb",
-                        "steps": [{"range": [0, 100], "color": "#e0e0e0"}],
-                    },
-                )
-            )
-            fig.update_layout(autosize=True, margin=dict(l=15, r=15, t=40, b=20))
-            return fig
+        completed = completed_count
+        inprogress = inprogress_count
+        notstarted = notstarted_count
+        overdue = overdue_count
+
         dial_colors = ["#003366", "#007acc", "#00b386", "#e67300"]
 
-        with st.container():
-            cols = st.columns(5)
-            widgets = [notstarted, inprogress, completed, overdue]
-            titles = ["Not Started", "In Progress", "Completed", "Overdue"]
-            for idx_col, (c, val, t, col) in enumerate(zip(cols, widgets, titles, dial_colors)):
-                with c:
-                    st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
-                    st.plotly_chart(create_colored_gauge(val, total, t, col), use_container_width=True, key=f"kpi_{t.replace(' ','_')}")
-                    st.markdown("</div>", unsafe_allow_html=True)
+        # the four status dials share one figure, laid out on the same five-column grid as the rows below
+        widgets = [notstarted, inprogress, completed, overdue]
+        titles = ["Not Started", "In Progress", "Completed", "Overdue"]
+        kpi_gauges = tuple(
+            ((val / total * 100) if total > 0 else 0, t, col) for val, t, col in zip(widgets, titles, dial_colors)
+        )
+        st.plotly_chart(gauge_row_figure(kpi_gauges), use_container_width=True, key="kpi_row")
 
         with st.expander("📈 Additional Insights", expanded=True):
             st.markdown("### Expanded Project Insights")
-            df_duration2 = df_main.copy().replace("Null", None)
-            df_duration2["Start date"] = pd.to_datetime(df_duration2.get("Start date", pd.Series([])), errors="coerce")
-            df_duration2["Due date"] = pd.to_datetime(df_duration2.get("Due date", pd.Series([])), errors="coerce")
-            df_duration2["Duration"] = (df_duration2["Due date"] - df_duration2["Start date"]).dt.days
-            avg_duration_local = df_duration2["Duration"].mean()
-
-            st.markdown(f"**⏱️ Average Task Duration:** {avg_duration_local:.1f} days" if pd.notna(avg_duration_local) else "**⏱️ Average Task Duration:** N/A")
+            st.markdown(f"**⏱️ Average Task Duration:** {avg_duration:.1f} days" if pd.notna(avg_duration) else "**⏱️ Average Task Duration:** N/A")
 
-            priority_counts = df_main.get("Priority", pd.Series([])).value_counts(normalize=True) * 100
             st.markdown("#### 🔰 Priority Distribution")
-            # render priority gauges in rows of up to 4 to match KPI sizes
-            pr_cols = st.columns(5)
-            priority_colors = ["#ff6600", "#0099cc", "#00cc66", "#cc3366"]
-            for i, (priority, pct) in enumerate(priority_counts.items()):
-                col_idx = i % 4
-                with pr_cols[col_idx]:
-                    st.plotly_chart(
-                        create_colored_gauge(pct, 100, f"{priority} Priority", priority_colors[i % len(priority_colors)]),
-                        use_container_width=True,
-                        key=f"priority_{priority.replace(' ','_')}"
-                    )
-
-            if "Bucket Name" in df_main.columns:
-                completion_by_bucket = (
-                    df_main.groupby("Bucket Name")["Progress"]
-                    .apply(lambda x: (x.str.lower() == "completed").mean() * 100)
-                    .reset_index()
-                    .rename(columns={"Progress": "Completion %"})
+            # render priority gauges in rows of up to 4 to match KPI sizes, one figure per row
+            priority_gauges, bucket_gauges = breakdown_gauges(data_path, data_last_mod, today_ts)
+            for i in range(0, len(priority_gauges), 4):
+                st.plotly_chart(
+                    gauge_row_figure(priority_gauges[i : i + 4]),
+                    use_container_width=True,
+                    key=f"priority_row_{i}"
                 )
 
+            if "Bucket Name" in df_main.columns:
                 st.markdown("#### 🧭 Phase Completion Dials")
-                # Reorder so 'Setup and Mobilisation' sits immediately after 'Post Implementation Phase' if present
-                completion_by_bucket = (
-                    df_main.groupby("Bucket Name")["Progress"]
-                    .apply(lambda x: (x.str.lower() == "completed").mean() * 100)
-                    .reset_index()
-                    .rename(columns={"Progress": "Completion %"})
-                )
-
-                buckets = completion_by_bucket.copy()
-                buckets['Bucket Name'] = buckets['Bucket Name'].astype(str).str.strip()
-
-                pip_idx = None
-                setup_idx = None
-                for idx_row, name in enumerate(buckets['Bucket Name'].astype(str)):
-                    low = name.lower()
-                    if 'post implementation' in low:
-                        pip_idx = idx_row
-                    if 'setup' in low and 'mobil' in low:
-                        setup_idx = idx_row
-
-                if setup_idx is not None:
-                    setup_row = buckets.iloc[[setup_idx]].copy()
-                    buckets = buckets.drop(buckets.index[setup_idx]).reset_index(drop=True)
-                    if pip_idx is not None:
-                        if setup_idx < pip_idx:
-                            pip_idx -= 1
-                        insert_at = pip_idx + 1
-                    else:
-                        insert_at = min(4, len(buckets))
-                    buckets = pd.concat([buckets.iloc[:insert_at], setup_row, buckets.iloc[insert_at:]]).reset_index(drop=True)
-
-                # render bucket completion dials in rows of up to 5 to match KPI sizes
-                if not buckets.empty:
-                    bucket_cols = st.columns(5)
-                    for i, row in enumerate(buckets.itertuples(index=False)):
-                        bucket_name = row[0]
-                        bucket_pct = row[1]
-                        col_idx = i % 5
-                        with bucket_cols[col_idx]:
-                            st.plotly_chart(
-                                create_colored_gauge(bucket_pct, 100, bucket_name, "#006666"),
-                                use_container_width=True,
-                                key=f"bucket_{i}_{str(bucket_name).replace(' ','_')}"
-                            )
+                # render bucket completion dials in rows of up to 5 to match KPI sizes, one figure per row
+                if bucket_gauges:
+                    for i in range(0, len(bucket_gauges), 5):
+                        st.plotly_chart(
+                            gauge_row_figure(bucket_gauges[i : i + 5]),
+                            use_container_width=True,
+                            key=f"bucket_row_{i}"
+                        )
 
 # ===================== TASK BREAKDOWN TAB =====================
-with tabs[2]:
+NULL_HTML = "<i style='color:gray;'>Null</i>"
+
+def task_row_colors(df, overdue, progress):
+    # row colours are classified column-wise from the status masks computed at load time
+    if "Progress" not in df.columns or "Due date" not in df.columns:
+        return np.full(len(df), bg_color, dtype=object)
+    return np.select(
+        [overdue, progress == "in progress", progress == "not started", progress == "completed"],
+        [table_colors["Overdue"], table_colors["In Progress"], table_colors["Not Started"], table_colors["Completed"]],
+        default=bg_color,
+    )
+
+def df_to_html(df, row_colors):
+    header = "".join(f"<th>{html.escape(str(col))}</th>" for col in df.columns)
+    if df.empty:
+        return f"<div style='overflow-x:auto;'><table><tr>{header}</tr></table></div>"
+    # cells are escaped, wrapped and joined column-wise with Arrow string kernels, not cell by cell
+    text = df.astype(object).astype(str).apply(
+        lambda s: s.str.replace("&", "&amp;", regex=False).str.replace("<", "&lt;", regex=False).str.replace(">", "&gt;", regex=False)
+    )
+    cells = "<td>" + text.mask(df.isna().to_numpy(), NULL_HTML) + "</td>"
+    rows = cells.iloc[:, 0].str.cat([cells.iloc[:, i] for i in range(1, cells.shape[1])])
+    body = "".join("<tr style='background-color:" + pd.Series(row_colors, index=df.index, dtype=str) + ";'>" + rows + "</tr>")
+    return f"<div style='overflow-x:auto;'><table><tr>{header}</tr>{body}</table></div>"
+
+# the classic table is built once per workbook version and day, not on every rerun of the tab
+@st.cache_data(show_spinner=False)
+def task_table_html(path, last_modified, today):
+    df = prepare_main(path, last_modified)
+    kpis = compute_kpis(path, last_modified, today)
+    return df_to_html(df, task_row_colors(df, kpis["overdue_mask"].to_numpy(), kpis["progress_lc"].to_numpy()))
+
+# the Classic view toggle only reruns this tab, not the whole script
+@st.fragment
+def render_task_breakdown_tab():
     st.subheader(f"Task Overview ({df_main.shape[0]} rows)")
 
-    def df_to_html(df):
-        html = "<div style='overflow-x:auto;'>"
-        html += "<table>"
-        html += "<tr>"
-        for col in df.columns:
-            html += f"<th>{col}</th>"
-        html += "</tr>"
-        for _, row in df.iterrows():
-            row_color = bg_color
-            if "Progress" in df.columns and "Due date" in df.columns:
-                progress = str(row["Progress"]).lower()
-                try:
-                    due_date = pd.to_datetime(row["Due date"], errors="coerce")
-                except Exception:
-                    due_date = None
-                if pd.notna(due_date) and due_date < pd.Timestamp.today() and progress != "completed":
-                    row_color = table_colors["Overdue"]
-                elif progress == "in progress":
-                    row_color = table_colors["In Progress"]
-                elif progress == "not started":
-                    row_color = table_colors["Not Started"]
-                elif progress == "completed":
-                    row_color = table_colors["Completed"]
-            html += f"<tr style='background-color:{row_color};'>"
-            for cell in row:
-                cell_display = f"<i style='color:gray;'>Null</i>" if str(cell).strip() == "Null" else str(cell)
-                html += f"<td>{cell_display}</td>"
-            html += "</tr>"
-        html += "</table>"
-        html += "</div>"
-        return html
-
-    st.markdown(df_to_html(df_main), unsafe_allow_html=True)
+    def df_to_styler(df, row_colors):
+        # st.dataframe ships the data as Arrow and only renders the visible rows
+        # one whole-frame style array: the row colour on every cell, plus grey italics where missing
+        row_css = np.char.add("background-color: ", np.asarray(row_colors, dtype=str))[:, None]
+        styles = np.where(df.isna().to_numpy(), np.char.add(row_css, "; color: gray; font-style: italic"), row_css)
+        # the grid keeps native dtypes (so date columns sort as dates); missing cells only display as Null
+        date_cols = df.select_dtypes(include="datetime").columns
+        return (
+            df.style.apply(lambda _: styles, axis=None)
+            .format(na_rep="Null")
+            .format("{:%Y-%m-%d}", subset=date_cols, na_rep="Null")
+        )
+
+    if st.toggle("Classic view", value=False, help="Render the full table as HTML instead of the scrollable grid"):
+        st.markdown(task_table_html(data_path, data_last_mod, today_ts), unsafe_allow_html=True)
+    elif df_main.size > int(pd.get_option("styler.render.max_elements")):
+        # st.dataframe refuses a Styler over this many cells, so large sheets get the unstyled grid
+        st.caption("Row colours are left out of the grid for a table this large; the Classic view still shows them.")
+        date_cols = df_main.select_dtypes(include="datetime").columns
+        st.dataframe(
+            df_main,
+            use_container_width=True,
+            hide_index=True,
+            column_config={c: st.column_config.DateColumn(format="YYYY-MM-DD") for c in date_cols},
+        )
+    else:
+        row_colors = task_row_colors(df_main, overdue_mask.to_numpy(), progress_lc.to_numpy())
+        st.dataframe(df_to_styler(df_main, row_colors), use_container_width=True, hide_index=True)
 
 # ===================== TIMELINE TAB =====================
-with tabs[3]:
+def render_timeline_tab():
     if "Start date" in df_main.columns and "Due date" in df_main.columns:
-        df_copy = df_main.replace("Null", None)
-        timeline = df_copy.dropna(subset=["Start date", "Due date"]).copy()
+        timeline = df_main.dropna(subset=["Start date", "Due date"])
         if not timeline.empty:
             timeline["task_short"] = timeline[df_main.columns[0]].astype(str).str.slice(0, 60)
             progress_color_map = {
@@ -814,17 +1297,24 @@ with tabs[3]:
                 "In Progress": "#3399ff",
                 "Completed": "#33cc33",
             }
-            timeline["Progress"] = timeline["Progress"].fillna("Not Specified")
-            timeline["color_label"] = timeline["Progress"].map(lambda x: x if x in progress_color_map else "Other")
-            fig_tl = px.timeline(
-                timeline,
-                x_start="Start date",
-                x_end="Due date",
-                y="task_short",
-                color="color_label",
-                title="Task Timeline",
-                color_discrete_map=progress_color_map,
-            )
+            timeline["Progress"] = timeline["Progress"].astype(object).fillna("Not Specified")
+            timeline["color_label"] = timeline["Progress"].where(timeline["Progress"].isin(list(progress_color_map)), "Other")
+            total_tasks = len(timeline)
+            timeline = thin_timeline(timeline)
+            if len(timeline) < total_tasks:
+                st.caption(f"Showing {len(timeline)} of {total_tasks} tasks: the longest ones, keeping at least one per start week where possible.")
+            if len(timeline) > TIMELINE_WEBGL_THRESHOLD:
+                fig_tl = timeline_webgl_figure(timeline, progress_color_map)
+            else:
+                fig_tl = px.timeline(
+                    timeline,
+                    x_start="Start date",
+                    x_end="Due date",
+                    y="task_short",
+                    color="color_label",
+                    title="Task Timeline",
+                    color_discrete_map=progress_color_map,
+                )
             fig_tl.update_yaxes(autorange="reversed")
             fig_tl.update_xaxes(dtick="M1", tickformat="%b %Y", showgrid=True, gridcolor="lightgray", tickangle=-30)
             fig_tl.update_layout(autosize=True, margin=dict(l=20, r=20, t=40, b=20))
@@ -833,106 +1323,34 @@ with tabs[3]:
         st.info("Timeline data not available.")
 
 # ===================== EXPORT REPORT TAB =====================
-with tabs[4]:
+def render_export_tab():
     st.subheader("📄 Export Smart Meter Project Report")
 
     if not df_main.empty:
-        buf = BytesIO()
-        doc = SimpleDocTemplate(buf, pagesize=landscape(A4))
-        story = []
-        styles = getSampleStyleSheet()
-
-        cell_style = ParagraphStyle(name="CellStyle", fontSize=8, leading=10, alignment=1)
-        null_style = ParagraphStyle(name="NullStyle", fontSize=8, textColor=colors.grey,
-                                    leading=10, alignment=1, fontName="Helvetica-Oblique")
-
-        story.append(Paragraph("<b>Ethekwini WS-7761 Smart Meter Project Report</b>", styles["Title"]))
-        story.append(Spacer(1, 12))
-        story.append(Paragraph(f"Generated on: {datetime.now().strftime('%d %B %Y, %H:%M')}", styles["Normal"]))
-        story.append(Spacer(1, 12))
-        story.append(Image(logo_url, width=120, height=70))
-        story.append(Spacer(1, 12))
-
-        kpi_data = [
-            ["Metric", "Count"],
-            ["Total Tasks", len(df_main)],
-            ["Completed", df_main["Progress"].str.lower().eq("completed").sum()],
-            ["In Progress", df_main["Progress"].str.lower().eq("in progress").sum()],
-            ["Not Started", df_main["Progress"].str.lower().eq("not started").sum()],
-            ["Overdue", (
-                (pd.to_datetime(df_main["Due date"], errors="coerce") < pd.Timestamp.today())
-                & (~df_main["Progress"].str.lower().eq("completed"))
-            ).sum()],
-            ["Average Duration (days)", f"{avg_duration:.1f}" if pd.notna(avg_duration) else "N/A"],
-        ]
-        table = Table(kpi_data, colWidths=[200, 100])
-        table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-            ("GRID", (0, 0), (-1, -1), 1, colors.grey),
-            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ]))
-        story.append(table)
-        story.append(Spacer(1, 20))
-
-        if not df_install.empty:
-            story.append(Paragraph("<b>Installations Summary</b>", styles["Heading2"]))
-            story.append(Spacer(1, 6))
-            install_head = df_install.head(10).fillna("Null")
-            data_i = [list(install_head.columns)]
-            for _, r in install_head.iterrows():
-                row_vals = []
-                for v in r:
-                    if str(v).strip() == "Null":
-                        row_vals.append(Paragraph("<i>Null</i>", null_style))
-                    else:
-                        row_vals.append(Paragraph(str(v), cell_style))
-                data_i.append(row_vals)
-            col_count_i = len(install_head.columns) if len(install_head.columns) > 0 else 1
-            table_i = Table(data_i, colWidths=[(A4[1] - 80) / col_count_i] * col_count_i, repeatRows=1)
-            table_i.setStyle(TableStyle([
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-            ]))
-            story.append(table_i)
-            story.append(Spacer(1, 12))
-
-        story.append(Paragraph("<b>Task Summary</b>", styles["Heading2"]))
-        limited = df_main.head(15).copy()
-        limited = limited.fillna("Null").replace("NaT", "Null")
-
-        data = [list(limited.columns)]
-        for _, row in limited.iterrows():
-            wrapped_row = []
-            for cell in row:
-                if str(cell).strip() == "Null":
-                    wrapped_row.append(Paragraph("<i>Null</i>", null_style))
-                else:
-                    wrapped_row.append(Paragraph(str(cell), cell_style))
-            data.append(wrapped_row)
-
-        col_count = len(limited.columns) if len(limited.columns) > 0 else 1
-        task_table = Table(data, colWidths=[(A4[1] - 80) / col_count] * col_count, repeatRows=1)
-        task_table.setStyle(TableStyle([
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ]))
-
-        story.append(task_table)
-        story.append(Spacer(1, 20))
-        story.append(Paragraph("Ethekwini Municipality | Automated Project Report", styles["Normal"]))
-
-        doc.build(story)
-
+        kpi_rows = (
+            ("Total Tasks", len(df_main)),
+            ("Completed", completed_count),
+            ("In Progress", inprogress_count),
+            ("Not Started", notstarted_count),
+            ("Overdue", overdue_count),
+            ("Average Duration (days)", f"{avg_duration:.1f}" if pd.notna(avg_duration) else "N/A"),
+        )
+        # the report is only built when the download is clicked (on a worker thread), and
+        # build_pdf is cached per workbook version and KPI values, so repeat downloads are instant
+        report_key = (data_last_mod, install_last_mod, kpi_rows)
         st.download_button(
             "📥 Download PDF Report",
-            data=buf.getvalue(),
+            data=lambda: build_pdf(*report_key, get_logo_bytes()),
             file_name="Ethekwini_WS7761_SmartMeter_Report.pdf",
             mime="application/pdf",
+            # a download changes nothing on the page, so it does not trigger a rerun
+            on_click="ignore",
         )
     else:
         st.warning("No data found to export.")
+
+# ===================== RENDER SELECTED TAB =====================
+for tab, render_tab in zip(tabs, [render_installations_tab, render_kpi_tab, render_task_breakdown_tab, render_timeline_tab, render_export_tab]):
+    with tab:
+        if tab.open:
+            render_tab()
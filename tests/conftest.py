@@ -0,0 +1,20 @@
+import importlib
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture(scope="module")
+def app():
+    # app.py is a Streamlit script; importing it runs the page once in bare mode from the repo root
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    sys.path.insert(0, str(ROOT))
+    try:
+        return importlib.import_module("app")
+    finally:
+        os.chdir(cwd)
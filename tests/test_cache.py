@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def cache_dir(app, monkeypatch, tmp_path):
+    monkeypatch.setattr(app, "CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+def test_cache_version_invalidates_and_prunes_older_frames(app, monkeypatch, cache_dir, tmp_path):
+    book = tmp_path / "book.xlsx"
+    book.write_bytes(b"not really a workbook")
+    old = app.workbook_fingerprint(str(book), 1.0)
+    app.write_cached_sheet(old, "Tasks", pd.DataFrame({"Late": ["false"]}))
+
+    monkeypatch.setattr(app, "CACHE_VERSION", app.CACHE_VERSION + 1)
+    new = app.workbook_fingerprint(str(book), 1.0)
+    assert new != old
+    assert app.read_cached_sheet(new, "Tasks") is None
+
+    app.prune_sheet_cache(str(book), new)
+    assert list(cache_dir.iterdir()) == []
+
+
+def test_concurrent_cache_writes_never_publish_a_mixed_file(app, cache_dir):
+    from concurrent.futures import ThreadPoolExecutor
+
+    frames = [pd.DataFrame({"n": range(i * 1000, (i + 1) * 1000)}) for i in range(8)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda df: app.write_cached_sheet("book.xlsx_0123456789abcdef", "Tasks", df), frames))
+
+    written = app.read_cached_sheet("book.xlsx_0123456789abcdef", "Tasks")
+    assert any(written.equals(df) for df in frames)
+    assert [p.name for p in cache_dir.iterdir()] == ["book.xlsx_0123456789abcdef_Tasks.parquet"]
@@ -0,0 +1,22 @@
+from io import BytesIO
+
+import pytest
+
+
+def test_failed_logo_download_is_not_cached(app, monkeypatch, tmp_path):
+    calls = []
+
+    def flaky_urlopen(url, timeout):
+        calls.append(url)
+        if len(calls) == 1:
+            raise OSError("network unreachable")
+        return BytesIO(b"png bytes")
+
+    monkeypatch.setattr(app, "urlopen", flaky_urlopen)
+    missing, url = str(tmp_path / "missing.png"), "https://example.invalid/logo.png"
+
+    with pytest.raises(OSError):
+        app.fetch_logo_bytes(missing, url)
+    assert app.fetch_logo_bytes(missing, url) == b"png bytes"
+    assert app.fetch_logo_bytes(missing, url) == b"png bytes"
+    assert len(calls) == 2
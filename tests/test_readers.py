@@ -0,0 +1,25 @@
+import pandas as pd
+
+from conftest import ROOT
+
+
+def test_rows_to_frame_mangles_duplicate_and_blank_headers(app):
+    df = app.rows_to_frame([["Contractor", "Contractor", None], ["A", "B", 1]])
+    assert list(df.columns) == ["Contractor", "Contractor.1", "Unnamed: 2"]
+
+
+def test_rows_to_frame_converts_text_cells_like_read_excel(app):
+    df = app.rows_to_frame([["Is Recurring", "Sites"], ["false", "12"], ["true", "7"]])
+    assert df["Is Recurring"].tolist() == [False, True]
+    assert pd.api.types.is_integer_dtype(df["Sites"])
+
+
+def test_rows_to_frame_matches_read_excel_on_the_task_workbook(app):
+    path = ROOT / app.data_path
+    wb = app.open_workbook(path)
+    try:
+        for sheet in app.workbook_sheet_names(wb):
+            expected = pd.read_excel(path, sheet_name=sheet)
+            pd.testing.assert_frame_equal(app.rows_to_frame(app.read_sheet_rows(wb, sheet)), expected)
+    finally:
+        wb.close()
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def test_webgl_timeline_x_values_are_datetimes_for_ns_columns(app):
+    start = pd.Series(pd.to_datetime(["2025-09-13", "2025-10-01"])).astype("datetime64[ns]")
+    timeline = pd.DataFrame({
+        "Start date": start,
+        "Due date": start + pd.Timedelta(days=14),
+        "task_short": ["a", "b"],
+        "color_label": ["Completed", "Other"],
+    })
+    fig = app.timeline_webgl_figure(timeline, {"Completed": "#33cc33"})
+    xs = [x for trace in fig.data for x in trace.x if x is not None]
+    assert len(xs) == 4
+    assert all(isinstance(x, datetime) for x in xs)
+
+
+def _random_timeline(n, weeks, seed=0):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2025-01-06") + pd.to_timedelta(rng.integers(0, weeks * 7, n), unit="D")
+    return pd.DataFrame({"Start date": start, "Due date": start + pd.to_timedelta(rng.integers(1, 60, n), unit="D")})
+
+
+@pytest.mark.parametrize("n, weeks, max_tasks", [(10_000, 52, 2000), (5_000, 300, 100)])
+def test_thin_timeline_fills_but_never_exceeds_the_cap(app, n, weeks, max_tasks):
+    timeline = _random_timeline(n, weeks)
+    thinned = app.thin_timeline(timeline, max_tasks=max_tasks)
+    assert len(thinned) == max_tasks
+
+
+def test_thin_timeline_keeps_one_task_per_start_week(app):
+    timeline = _random_timeline(10_000, 52)
+    thinned = app.thin_timeline(timeline, max_tasks=2000)
+    assert thinned["Start date"].dt.to_period("W").nunique() == timeline["Start date"].dt.to_period("W").nunique()